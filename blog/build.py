@@ -25,14 +25,20 @@ FORMAT sadrzaj.txt:
 
 import os
 import re
+import html
 import json
 import shutil
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
+from string import Formatter
 
 BLOG_DIR = Path(__file__).parent
 ROOT_DIR = BLOG_DIR.parent
 POSTS_JSON = BLOG_DIR / "posts.json"
+POSTS_CACHE = BLOG_DIR / ".posts.cache.json"
 BASE_URL = "https://tenderatlas.hr"
 
 MONTHS_HR = [
@@ -42,10 +48,29 @@ MONTHS_HR = [
 
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".svg"}
 
+# Image markup pattern, compiled once at import
+_IMG_RE = re.compile(r'\[SLIKA:\s*(.+?)\s*(?:\|\s*(.+?))?\s*\]')
 
+# Body line kinds, assigned once per line by _classify(). _H2.._IMG equal the
+# group numbers in _LINE_KIND_RE, so match.lastindex is the kind directly.
+_PARA, _H2, _H3, _QUOTE, _LIST, _IMG, _EMPTY = range(7)
+_LINE_KIND_RE = re.compile(r'(## )|(### )|(> )|(- )|(\[SLIKA:)')
+
+# Body markup indentation (inside <div class="blog-content">) and fixed tags
+_IND = "        "
+_IND2 = _IND + "  "
+_UL_OPEN = _IND + "<ul>"
+_UL_CLOSE = _IND + "</ul>"
+_FIG_OPEN = _IND + '<figure class="blog-figure">'
+_FIG_CLOSE = _IND + "</figure>"
+_QUOTE_OPEN = _IND + "<blockquote>"
+_QUOTE_CLOSE = _IND + "</blockquote>"
+
+
+@lru_cache(maxsize=512)
 def format_date_hr(date_str):
     """2026-02-20 -> '20. veljače 2026.'"""
-    d = datetime.strptime(date_str.strip(), "%Y-%m-%d")
+    d = date.fromisoformat(date_str.strip())
     return f"{d.day}. {MONTHS_HR[d.month - 1]} {d.year}."
 
 
@@ -60,145 +85,174 @@ def parse_metadata(header_text):
     return meta
 
 
-def txt_to_html_content(body_text, folder_name):
-    """Convert simple txt markup to HTML."""
-    lines = body_text.strip().splitlines()
+def _classify(stripped):
+    """Return the line kind (_EMPTY, _H2, ...) of a stripped body line."""
+    if not stripped:
+        return _EMPTY
+    m = _LINE_KIND_RE.match(stripped)
+    if m is None:
+        return _PARA
+    # A [SLIKA: line that isn't a complete image tag is plain text
+    if m.lastindex == _IMG and not _IMG_RE.match(stripped):
+        return _PARA
+    return m.lastindex
+
+
+def txt_to_html_parts(body_text, folder_name):
+    """Convert simple txt markup to a list of HTML lines."""
+    lines = [l.strip() for l in body_text.strip().splitlines()]
+    kinds = [_classify(l) for l in lines]
+    n = len(lines)
     html_parts = []
+    append = html_parts.append
     in_list = False
     i = 0
 
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
+    while i < n:
+        kind = kinds[i]
+        stripped = lines[i]
 
         # Empty line — close list if open, skip
-        if not stripped:
+        if kind == _EMPTY:
             if in_list:
-                html_parts.append("        </ul>")
+                append(_UL_CLOSE)
                 in_list = False
             i += 1
             continue
 
+        # List item: - text
+        if kind == _LIST:
+            if not in_list:
+                append(_UL_OPEN)
+                in_list = True
+            text = inline_format(stripped[2:].strip())
+            append(f"{_IND2}<li>{text}</li>")
+            i += 1
+            continue
+
+        # Any other block closes an open list
+        if in_list:
+            append(_UL_CLOSE)
+            in_list = False
+
         # Image: [SLIKA: file.png | Caption text]
-        img_match = re.match(r'\[SLIKA:\s*(.+?)\s*(?:\|\s*(.+?))?\s*\]', stripped)
-        if img_match:
-            if in_list:
-                html_parts.append("        </ul>")
-                in_list = False
+        if kind == _IMG:
+            img_match = _IMG_RE.match(stripped)
             img_file = img_match.group(1)
             caption = img_match.group(2) or ""
-            html_parts.append('        <figure class="blog-figure">')
-            html_parts.append(f'          <img src="{folder_name}/{img_file}" alt="{caption}" loading="lazy">')
+            append(_FIG_OPEN)
+            append(f'{_IND2}<img src="{folder_name}/{img_file}" alt="{caption}" loading="lazy">')
             if caption:
-                html_parts.append(f"          <figcaption>{caption}</figcaption>")
-            html_parts.append("        </figure>")
+                append(f"{_IND2}<figcaption>{caption}</figcaption>")
+            append(_FIG_CLOSE)
             i += 1
             continue
 
         # H2: ## Heading
-        if stripped.startswith("## ") and not stripped.startswith("### "):
-            if in_list:
-                html_parts.append("        </ul>")
-                in_list = False
+        if kind == _H2:
             text = inline_format(stripped[3:].strip())
-            html_parts.append(f"        <h2>{text}</h2>")
+            append(f"{_IND}<h2>{text}</h2>")
             i += 1
             continue
 
         # H3: ### Heading
-        if stripped.startswith("### "):
-            if in_list:
-                html_parts.append("        </ul>")
-                in_list = False
+        if kind == _H3:
             text = inline_format(stripped[4:].strip())
-            html_parts.append(f"        <h3>{text}</h3>")
+            append(f"{_IND}<h3>{text}</h3>")
             i += 1
             continue
 
         # Blockquote: > text
-        if stripped.startswith("> "):
-            if in_list:
-                html_parts.append("        </ul>")
-                in_list = False
+        if kind == _QUOTE:
             # Collect multi-line blockquote
             quote_lines = []
-            while i < len(lines) and lines[i].strip().startswith("> "):
-                quote_lines.append(lines[i].strip()[2:])
+            while i < n and kinds[i] == _QUOTE:
+                quote_lines.append(lines[i][2:])
                 i += 1
             quote_text = inline_format(" ".join(quote_lines))
-            html_parts.append("        <blockquote>")
-            html_parts.append(f"          {quote_text}")
-            html_parts.append("        </blockquote>")
-            continue
-
-        # List item: - text
-        if stripped.startswith("- "):
-            if not in_list:
-                html_parts.append("        <ul>")
-                in_list = True
-            text = inline_format(stripped[2:].strip())
-            html_parts.append(f"          <li>{text}</li>")
-            i += 1
+            append(_QUOTE_OPEN)
+            append(f"{_IND2}{quote_text}")
+            append(_QUOTE_CLOSE)
             continue
 
-        # Regular paragraph
-        if in_list:
-            html_parts.append("        </ul>")
-            in_list = False
-
-        # Collect consecutive non-empty, non-special lines as one paragraph
+        # Regular paragraph: collect consecutive plain lines
         para_lines = []
-        while i < len(lines):
-            l = lines[i].strip()
-            if not l or l.startswith("## ") or l.startswith("### ") or l.startswith("> ") or l.startswith("- ") or re.match(r'\[SLIKA:', l):
-                break
-            para_lines.append(l)
+        while i < n and kinds[i] == _PARA:
+            para_lines.append(lines[i])
             i += 1
         para_text = inline_format(" ".join(para_lines))
-        html_parts.append(f"        <p>{para_text}</p>")
-        continue
+        append(f"{_IND}<p>{para_text}</p>")
 
     if in_list:
-        html_parts.append("        </ul>")
+        append(_UL_CLOSE)
 
-    return "\n".join(html_parts)
+    return html_parts
 
 
-def inline_format(text):
-    """Handle **bold**, *italic*, [link](url)."""
-    # Bold: **text**
-    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
-    # Italic: *text*
-    text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
-    # Links: [text](url)
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
-    return text
-
-
-def generate_html(meta, content_html, folder_name):
-    """Generate full blog post HTML."""
-    title = meta.get("NASLOV", "Blog Post")
-    desc = meta.get("OPIS", "")
-    date = meta.get("DATUM", "2026-01-01")
-    tag = meta.get("KATEGORIJA", "Članak")
-    hero = meta.get("HERO", "")
-    slug = folder_name
-    date_hr = format_date_hr(date)
+def _find_italic_end(text, start):
+    """Find the closing * of an italic span, stepping over complete **bold** pairs."""
+    end = text.find("*", start)
+    while end != -1 and text.startswith("**", end):
+        bold_end = text.find("**", end + 3)
+        if bold_end == -1:
+            break
+        end = text.find("*", bold_end + 2)
+    return end
 
-    hero_section = ""
-    hero_img_url = ""
-    if hero:
-        hero_path = f"{folder_name}/{hero}"
-        hero_img_url = f"{BASE_URL}/blog/{hero_path}"
-        hero_section = f'''
-    <div class="blog-post-hero">
-      <img src="{hero_path}" alt="{title}">
-    </div>
-'''
-    else:
-        hero_img_url = f"{BASE_URL}/img.png"
 
-    return f'''<!DOCTYPE html>
+def inline_format(text):
+    """Handle **bold**, *italic*, [link](url) in a single left-to-right pass."""
+    parts = []
+    pos = 0
+    star = text.find("*")
+    bracket = text.find("[")
+
+    while star != -1 or bracket != -1:
+        if star != -1 and (bracket == -1 or star < bracket):
+            # Bold: **text**
+            if text.startswith("**", star):
+                end = text.find("**", star + 3)
+                if end != -1:
+                    parts.append(text[pos:star])
+                    parts.append(f"<strong>{inline_format(text[star + 2:end])}</strong>")
+                    pos = end + 2
+                    star = text.find("*", pos)
+                    if bracket != -1 and bracket < pos:
+                        bracket = text.find("[", pos)
+                    continue
+            # Italic: *text*
+            end = _find_italic_end(text, star + 2)
+            if end == -1:
+                star = text.find("*", star + 1)
+                continue
+            parts.append(text[pos:star])
+            parts.append(f"<em>{inline_format(text[star + 1:end])}</em>")
+            pos = end + 1
+            star = text.find("*", pos)
+            if bracket != -1 and bracket < pos:
+                bracket = text.find("[", pos)
+            continue
+
+        # Links: [text](url)
+        close = text.find("]", bracket + 1)
+        if close > bracket + 1 and text.startswith("(", close + 1):
+            end = text.find(")", close + 2)
+            if end > close + 2:
+                parts.append(text[pos:bracket])
+                parts.append(f'<a href="{text[close + 2:end]}">{inline_format(text[bracket + 1:close])}</a>')
+                pos = end + 1
+                bracket = text.find("[", pos)
+                if star != -1 and star < pos:
+                    star = text.find("*", pos)
+                continue
+        bracket = text.find("[", bracket + 1)
+
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+# Post page template; {name} fields are filled per post by write_html()
+_POST_TEMPLATE = '''<!DOCTYPE html>
 <html lang="hr">
 <head>
   <meta charset="UTF-8" />
@@ -229,8 +283,8 @@ def generate_html(meta, content_html, folder_name):
   {{
     "@context": "https://schema.org",
     "@type": "BlogPosting",
-    "headline": "{title}",
-    "description": "{desc}",
+    "headline": "{json_title}",
+    "description": "{json_desc}",
     "image": "{hero_img_url}",
     "datePublished": "{date}",
     "dateModified": "{date}",
@@ -309,7 +363,7 @@ def generate_html(meta, content_html, folder_name):
       </header>
 
       <div class="blog-content">
-{content_html}
+{body_parts}
       </div>
 
       <div class="blog-cta">
@@ -351,13 +405,153 @@ def generate_html(meta, content_html, folder_name):
 </html>
 '''
 
+# (literal, field) pairs, split once so the static markup is reused across posts
+_POST_CHUNKS = tuple(
+    (literal, field) for literal, field, _, _ in Formatter().parse(_POST_TEMPLATE)
+)
 
-def find_first_image(folder_path):
-    """Find the first image in folder for posts.json thumbnail."""
-    for f in sorted(folder_path.iterdir()):
-        if f.suffix.lower() in IMAGE_EXTENSIONS:
-            return f.name
-    return ""
+
+def write_html(meta, body_parts, folder_name, output_file):
+    """Write full blog post HTML to output_file, streaming body_parts as lines."""
+    title = meta.get("NASLOV", "Blog Post")
+    desc = meta.get("OPIS", "")
+    date = meta.get("DATUM", "2026-01-01")
+    tag = meta.get("KATEGORIJA", "Članak")
+    hero = meta.get("HERO", "")
+    slug = folder_name
+    date_hr = format_date_hr(date)
+
+    # Escape metadata once: HTML-escaped for markup/attributes, JSON-escaped for ld+json
+    title_e = html.escape(title, quote=True)
+    desc_e = html.escape(desc, quote=True)
+    tag_e = html.escape(tag, quote=True)
+    json_title = json.dumps(title, ensure_ascii=False)[1:-1].replace("</", "<\\/")
+    json_desc = json.dumps(desc, ensure_ascii=False)[1:-1].replace("</", "<\\/")
+
+    hero_section = ""
+    hero_img_url = ""
+    if hero:
+        hero_path = f"{folder_name}/{hero}"
+        hero_img_url = f"{BASE_URL}/blog/{hero_path}"
+        hero_section = f'''
+    <div class="blog-post-hero">
+      <img src="{hero_path}" alt="{title_e}">
+    </div>
+'''
+    else:
+        hero_img_url = f"{BASE_URL}/img.png"
+
+    values = {
+        "BASE_URL": BASE_URL,
+        "title": title_e,
+        "desc": desc_e,
+        "json_title": json_title,
+        "json_desc": json_desc,
+        "date": date,
+        "tag": tag_e,
+        "slug": slug,
+        "date_hr": date_hr,
+        "hero_section": hero_section,
+        "hero_img_url": hero_img_url,
+    }
+
+    with output_file.open("w", encoding="utf-8") as f:
+        for literal, field in _POST_CHUNKS:
+            f.write(literal)
+            if field == "body_parts":
+                sep = ""
+                for part in body_parts:
+                    f.write(sep)
+                    f.write(part)
+                    sep = "\n"
+            elif field is not None:
+                f.write(values[field])
+
+
+def scan_post_folder(folder_path):
+    """One pass over a post folder: (has sadrzaj.txt, first image name by sort order or "")."""
+    has_txt = False
+    first_img = ""
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            name = entry.name
+            if name == "sadrzaj.txt":
+                has_txt = True
+            elif os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                if not first_img or name < first_img:
+                    first_img = name
+    return has_txt, first_img
+
+
+def is_up_to_date(output_file, txt_file):
+    """True if output_file exists and is newer than txt_file and build.py."""
+    try:
+        out_mtime = output_file.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return (out_mtime >= txt_file.stat().st_mtime
+            and out_mtime >= Path(__file__).stat().st_mtime)
+
+
+def _build_one(item, first_img, cached):
+    """Build a single post folder.
+
+    Returns (post dict or None, log messages, cache entry or None).
+    """
+    folder_name = item.name
+    slug = folder_name
+    txt_file = item / "sadrzaj.txt"
+    output_file = BLOG_DIR / f"{slug}.html"
+    txt_mtime = txt_file.stat().st_mtime
+    messages = [f"  📝 Gradim: {folder_name}/"]
+
+    # Unchanged sadrzaj.txt and up-to-date HTML: reuse cached metadata, don't open the file
+    if cached and cached["mtime"] == txt_mtime and is_up_to_date(output_file, txt_file):
+        meta = cached["meta"]
+        messages.append(f"  ⏭️  Nepromijenjeno: {slug}.html")
+    else:
+        # Read and parse txt
+        with txt_file.open("r", encoding="utf-8") as f:
+            raw = f.read()
+
+        # Split header and body at ---
+        header_part, sep, body_part = raw.partition("---")
+        if not sep:
+            messages.append(f"  ⚠️  {folder_name}/sadrzaj.txt nema --- separator, preskačem.")
+            return None, messages, None
+
+        meta = parse_metadata(header_part)
+
+        if not meta.get("NASLOV"):
+            messages.append(f"  ⚠️  {folder_name}/sadrzaj.txt nema NASLOV:, preskačem.")
+            return None, messages, None
+
+        # Skip rendering when the HTML is newer than both sadrzaj.txt and this script
+        if is_up_to_date(output_file, txt_file):
+            messages.append(f"  ⏭️  Nepromijenjeno: {slug}.html")
+        else:
+            # Convert body to HTML and write the page
+            write_html(meta, txt_to_html_parts(body_part, folder_name), folder_name, output_file)
+            messages.append(f"  ✅ Generirano: {slug}.html")
+
+    # Find hero or first image for thumbnail
+    hero = meta.get("HERO", "")
+    if hero:
+        thumb = f"{folder_name}/{hero}"
+    else:
+        thumb = f"{folder_name}/{first_img}" if first_img else "../img.png"
+
+    post = {
+        "file": f"{slug}.html",
+        "title": meta["NASLOV"],
+        "description": meta.get("OPIS", ""),
+        "date": meta.get("DATUM", "2026-01-01"),
+        "image": thumb,
+        "tag": meta.get("KATEGORIJA", "Članak")
+    }
+    return post, messages, {"mtime": txt_mtime, "meta": meta}
 
 
 def build_blog():
@@ -369,91 +563,74 @@ def build_blog():
     existing_posts = []
     if POSTS_JSON.exists():
         try:
-            existing_posts = json.loads(POSTS_JSON.read_text(encoding="utf-8"))
+            with POSTS_JSON.open("r", encoding="utf-8") as f:
+                existing_posts = json.load(f)
         except (json.JSONDecodeError, ValueError):
             existing_posts = []
 
+    # Parsed metadata from the previous run, keyed by folder name
+    cache = {}
+    if POSTS_CACHE.exists():
+        try:
+            with POSTS_CACHE.open("r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (json.JSONDecodeError, ValueError):
+            cache = {}
+
     # Keep track of manually managed posts (those without a subfolder)
     manual_posts = []
     generated_slugs = set()
 
     # Scan subfolders
-    for item in sorted(BLOG_DIR.iterdir()):
-        if not item.is_dir():
-            continue
-        if item.name.startswith("_") or item.name.startswith(".") or item.name in skip_dirs:
-            continue
+    with os.scandir(BLOG_DIR) as it:
+        entries = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
 
-        txt_file = item / "sadrzaj.txt"
-        if not txt_file.exists():
+    folders = []
+    first_images = []
+    for entry in entries:
+        if entry.name.startswith("_") or entry.name.startswith(".") or entry.name in skip_dirs:
             continue
 
-        folder_name = item.name
-        slug = folder_name
-        generated_slugs.add(slug)
-
-        print(f"  📝 Gradim: {folder_name}/")
-
-        # Read and parse txt
-        raw = txt_file.read_text(encoding="utf-8")
-
-        # Split header and body at ---
-        if "---" in raw:
-            header_part, body_part = raw.split("---", 1)
-        else:
-            print(f"  ⚠️  {folder_name}/sadrzaj.txt nema --- separator, preskačem.")
+        has_txt, first_img = scan_post_folder(entry.path)
+        if not has_txt:
             continue
 
-        meta = parse_metadata(header_part)
-
-        if not meta.get("NASLOV"):
-            print(f"  ⚠️  {folder_name}/sadrzaj.txt nema NASLOV:, preskačem.")
-            continue
-
-        # Convert body to HTML
-        content_html = txt_to_html_content(body_part, folder_name)
-
-        # Generate HTML file
-        html = generate_html(meta, content_html, folder_name)
-        output_file = BLOG_DIR / f"{slug}.html"
-        output_file.write_text(html, encoding="utf-8")
-        print(f"  ✅ Generirano: {slug}.html")
-
-        # Find hero or first image for thumbnail
-        hero = meta.get("HERO", "")
-        if hero:
-            thumb = f"{folder_name}/{hero}"
-        else:
-            first_img = find_first_image(item)
-            thumb = f"{folder_name}/{first_img}" if first_img else "../img.png"
-
-        # Add to posts list
-        posts.append({
-            "file": f"{slug}.html",
-            "title": meta["NASLOV"],
-            "description": meta.get("OPIS", ""),
-            "date": meta.get("DATUM", "2026-01-01"),
-            "image": thumb,
-            "tag": meta.get("KATEGORIJA", "Članak")
-        })
+        folders.append(Path(entry.path))
+        first_images.append(first_img)
+        generated_slugs.add(entry.name)
+
+    # Posts are independent, so build them in parallel; map() keeps folder order
+    cached = [cache.get(folder.name) for folder in folders]
+    new_cache = {}
+    with ProcessPoolExecutor() as ex:
+        results = ex.map(_build_one, folders, first_images, cached)
+        for folder, (post, messages, entry) in zip(folders, results):
+            for msg in messages:
+                print(msg)
+            if post:
+                posts.append(post)
+                new_cache[folder.name] = entry
 
     # Keep manually added posts that don't have a subfolder
     for ep in existing_posts:
         ep_slug = ep.get("file", "").replace(".html", "")
         if ep_slug not in generated_slugs:
+            ep.setdefault("date", "")
             manual_posts.append(ep)
 
     # Merge: generated + manual, sorted by date descending
     all_posts = posts + manual_posts
-    all_posts.sort(key=lambda p: p.get("date", ""), reverse=True)
+    all_posts.sort(key=itemgetter("date"), reverse=True)
 
     # Write posts.json
-    POSTS_JSON.write_text(
-        json.dumps(all_posts, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+    with POSTS_JSON.open("w", encoding="utf-8") as f:
+        json.dump(all_posts, f, ensure_ascii=False, indent=2)
     print(f"\n  📋 posts.json ažuriran ({len(all_posts)} postova)")
 
+    # Save metadata cache for the next run (only folders that still exist)
+    with POSTS_CACHE.open("w", encoding="utf-8") as f:
+        json.dump(new_cache, f, ensure_ascii=False)
+
 
 if __name__ == "__main__":
     print("\n🔨 TenderAtlas Blog Build\n" + "=" * 35)